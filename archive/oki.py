@@ -11,8 +11,13 @@ It supports two printing modes:
       - Carriage Return (CR)
       - Line Feed (LF)
       - A number of Horizontal Tabs (HT) based on the Left Margin spinbox value
+        (only when “Margin Escape” is unchecked -- see below)
       - The entire current line’s text as one command
       - A newline is inserted in the text widget.
+“Margin Escape” is unchecked by default, so the margin is made with the HT padding above. When it is
+checked, the left margin is instead set on the printer with the MICROLINE left-margin escape
+(ESC % C nnn, column 8 × spinbox value + 1) whenever the Left Margin spinbox changes, so CR alone
+returns the head to the margin. Only check it on firmware known to support that escape.
 Persistent formatting toggles (Italic, Emphasized, Underline Printing) send their command once.
 Other integrated controls (character sets, CPI, spacing, print quality, speed, double height, proportional, skip over perforation) behave as before.
 **Important:** In the CPI section, a “Double Wide” checkbox is provided. When checked, after the current CPI command is executed, the Double Wide code (ASCII 31, i.e. b"\x1F") is executed; when unchecked, the current CPI code is re-sent.
@@ -25,12 +30,17 @@ The Print Quality section now includes a “Utility” option.
 A new “Shift In/Out” checkbox in the Manual Commands section sends a Shift In (ASCII 15) or Shift Out (ASCII 14) command when toggled.
 Additional Printing Options (Unidirectional Printing and Enhanced Printing) are in their own section.
 Manual command buttons are provided for Line Feed, Carriage Return, Form Feed, Horizontal Tab, Backspace, Vertical Tab, Reverse Line Feed, and Reset (Clear Print Buffer).
-Debug Mode is on by default, and all command bytes are logged (in decimal) in the integrated debug panel.
+Debug Mode is on by default, and all command bytes are logged (in hex) in the integrated debug panel.
 """
 
 import tkinter as tk
-from tkinter import messagebox, scrolledtext
+from tkinter import scrolledtext
+import itertools
+import queue
+import select
+from functools import lru_cache
 import socket
+import threading
 
 # ------------------ Default Configuration ------------------
 DEFAULT_CONFIG = {
@@ -39,9 +49,20 @@ DEFAULT_CONFIG = {
     "DEFAULT_EMULATION": "Okidata",
     "DEFAULT_CPI": "10 cpi",
     "DEFAULT_SKIP_PERFORATION": 0,
-    "DEFAULT_LEFT_MARGIN": 0
+    "DEFAULT_LEFT_MARGIN": 0,
+    # ESC % C is unverified on real hardware, so HT padding stays the default.
+    "DEFAULT_MARGIN_ESCAPE": False
 }
 
+# ------------------ Parameterized Command Tables ------------------
+# Every payload of the two parameterized commands, built once at import and
+# indexed by n instead of being reassembled on each call.
+SKIP_TABLE = tuple(b"\x1B\x25\x53\x30" if n == 0 else b"\x1B\x47" + bytes([n, n]) for n in range(10))
+SPACING_144 = tuple(b"\x1B\x25\x39" + bytes([n]) for n in range(256))
+# ESC % C nnn sets the left margin to column nnn (three ASCII digits); one
+# entry per Left Margin spinbox value, each HT stop being 8 columns.
+LEFT_MARGIN_TABLE = tuple(b"\x1B\x25\x43" + b"%03d" % (8 * n + 1) for n in range(21))
+
 # ------------------ Okidata MICROLINE Command Dictionary ------------------
 OKIDATA_COMMANDS = {
     "Backspace": b"\x08",
@@ -78,7 +99,7 @@ OKIDATA_COMMANDS = {
     "Reverse Line Feed": b"\x1B\x0A",
     "Set Spacing to 1/6\"": b"\x1B\x36",
     "Set Spacing to 1/8\"": b"\x1B\x38",
-    "Set Spacing to n/144": lambda n: b"\x1B\x25\x39" + bytes([n]),
+    "Set Spacing to n/144": SPACING_144,
     "Print Quality Select HSD/SSD": b"\x1B\x23\x30",
     "Select NLQ Courier": b"\x1B\x31",
     "Select NLQ Gothic": b"\x1B\x33",
@@ -87,11 +108,101 @@ OKIDATA_COMMANDS = {
     "Proportional Printing On": b"\x1B\x59",
     "Proportional Printing Off": b"\x1B\x5A",
     "Reset (Clear Print Buffer)": b"\x18",
-    "Skip Over Perforation": lambda n: b"\x1B\x25\x53\x30" if n == 0 else b"\x1B\x47" + bytes([n]) + bytes([n]),
+    "Skip Over Perforation": SKIP_TABLE,
+    "Set Left Margin": LEFT_MARGIN_TABLE,
     "Shift In": b"\x0F",
     "Shift Out": b"\x0E"
 }
 
+# ------------------ Control Value -> Command Maps ------------------
+FONT_MAP = {
+    "Block Graphic Set": OKIDATA_COMMANDS["Block Graphic Set"],
+    "Publisher Set": OKIDATA_COMMANDS["Publisher Set"],
+    "Line Graphics Set": OKIDATA_COMMANDS["Line Graphics Set"],
+    "Standard Character Set": OKIDATA_COMMANDS["Standard Character Set"],
+}
+
+CPI_MAP = {
+    "10 cpi": OKIDATA_COMMANDS["Select 10 cpi"],
+    "12 cpi": OKIDATA_COMMANDS["Select 12 cpi"],
+    "15 cpi": OKIDATA_COMMANDS["Select 15 cpi"],
+    "17.1 cpi": OKIDATA_COMMANDS["Select 17.1 cpi"],
+    "20 cpi": OKIDATA_COMMANDS["Select 20 cpi"],
+}
+
+# "n/144" is parameterized by the spacing_n entry, so it maps to a table indexed by n.
+SPACING_MAP = {
+    "1/6": OKIDATA_COMMANDS["Set Spacing to 1/6\""],
+    "1/8": OKIDATA_COMMANDS["Set Spacing to 1/8\""],
+    "n/144": SPACING_144,
+}
+
+QUALITY_MAP = {
+    "HSD/SSD": OKIDATA_COMMANDS["Print Quality Select HSD/SSD"],
+    "NLQ Courier": OKIDATA_COMMANDS["Select NLQ Courier"],
+    "NLQ Gothic": OKIDATA_COMMANDS["Select NLQ Gothic"],
+    "Utility": OKIDATA_COMMANDS["Select Utility"],
+}
+
+SPEED_MAP = {
+    "Full": OKIDATA_COMMANDS["Print Speed Set to Full"],
+    "Half": OKIDATA_COMMANDS["Print Speed Set to Half"],
+}
+
+DOUBLE_HEIGHT_MAP = {
+    True: OKIDATA_COMMANDS["Double Height On"],
+    False: OKIDATA_COMMANDS["Double Height Off"],
+}
+
+PROPORTIONAL_MAP = {
+    True: OKIDATA_COMMANDS["Proportional Printing On"],
+    False: OKIDATA_COMMANDS["Proportional Printing Off"],
+}
+
+def _table_cmd(table, n):
+    return table[n] if 0 <= n < len(table) else b""
+
+# Debug-log lines show command bytes as uppercase hex (matching the escapes
+# above), cached per line -- the same (tag, command) pairs (CR, LF, HT, common
+# keys, toggles) recur all session long.
+@lru_cache(maxsize=512)
+def _fmt_log(tag, cmd):
+    return f"{tag} {cmd.hex(' ').upper()}\n"
+
+# Shared one-byte payloads for ASCII keystrokes, so printable keys don't go
+# through the UTF-8 encoder and allocate a new bytes object each time.
+ASCII_BYTES = tuple(bytes([i]) for i in range(128))
+
+# Shift and Control in a key event's state; with either held, Tab is focus
+# traversal in a Text widget and inserts nothing.
+TAB_MODIFIERS = 0x0001 | 0x0004
+
+# Control plus the windowing system's Alt/Meta (Command on macOS) bit in a key
+# event's state. With any of them held the Text widget inserts nothing, even
+# though event.char can still be printable (Ctrl+1, Alt+a on X11).
+COMMAND_MODIFIERS = {
+    "x11": 0x0004 | 0x0008,
+    "win32": 0x0004 | 0x20000,
+    "aqua": 0x0004 | 0x0008,
+}
+
+# 1 for the printable ASCII codes (space through "~"), 0 for control codes.
+PRINTABLE = bytes(1 if 32 <= i < 127 else 0 for i in range(128))
+
+# Keys that move the Text insert cursor without typing a character.
+CURSOR_KEYS = frozenset((
+    "Left", "Right", "Up", "Down", "Home", "End", "Prior", "Next", "Delete",
+    "KP_Left", "KP_Right", "KP_Up", "KP_Down", "KP_Home", "KP_End", "KP_Prior", "KP_Next", "KP_Delete",
+))
+
+# Line-length display background, indexed by how many of (gap >= 0,
+# gap >= 0.5) hold for the gap to the right margin. Hex values, so Tk
+# doesn't have to look up a color name.
+LINE_LENGTH_COLORS = ("#e02020", "#e0e000", "#00c000")
+
+# Oldest debug-panel lines are trimmed past this many rows to bound memory.
+DEBUG_MAX_LINES = 5000
+
 # ------------------ Integrated Formatting Commands ------------------
 FORMAT_COMMANDS = {
     "Okidata": {
@@ -104,6 +215,7 @@ FORMAT_COMMANDS = {
 class LiveKeystrokeEditor:
     def __init__(self, master):
         self.master = master
+        self._command_mods = COMMAND_MODIFIERS.get(master.tk.call("tk", "windowingsystem"), 0x0004)
         master.title("Okidata Printer – Integrated Controls")
         
         self.debug_mode = tk.BooleanVar(value=True)
@@ -127,6 +239,7 @@ class LiveKeystrokeEditor:
         self.speed_var = tk.StringVar(value="Full")
         self.skip_perforation = tk.IntVar(value=DEFAULT_CONFIG["DEFAULT_SKIP_PERFORATION"])
         self.left_margin_count = tk.IntVar(value=DEFAULT_CONFIG["DEFAULT_LEFT_MARGIN"])
+        self.margin_escape = tk.BooleanVar(value=DEFAULT_CONFIG["DEFAULT_MARGIN_ESCAPE"])
         
         self.mode_var = tk.StringVar(value="Line-by-Line")
         self.right_margin_var = tk.DoubleVar(value=7.5)
@@ -137,6 +250,43 @@ class LiveKeystrokeEditor:
         # New: Shift state variable.
         self.shift_state = tk.BooleanVar(value=False)
         
+        # Plain-attribute mirrors of the variables read on every keystroke,
+        # kept current by trace callbacks so hot paths skip the Tcl round trip.
+        self._mirror(self.debug_mode, "_debug")
+        self._mirror(self.mode_var, "_mode")
+        self._mirror(self.margin_escape, "_margin_escape")
+        # "10 cpi" -> 10.0 (and halved for Double Wide), and the right margin,
+        # parsed once per change instead of per key.
+        self._update_numeric_cpi()
+        self.cpi_var.trace_add("write", self._update_numeric_cpi)
+        self.double_wide.trace_add("write", self._update_numeric_cpi)
+        self._update_right_margin()
+        self.right_margin_var.trace_add("write", self._update_right_margin)
+        # Commands sent from the key handlers, looked up once here rather
+        # than in OKIDATA_COMMANDS on every keystroke.
+        self._CMD_TAB = OKIDATA_COMMANDS.get("Horizontal Tab", b"\t")
+        self._CMD_BS = OKIDATA_COMMANDS.get("Backspace", b"\x08")
+        self._CMD_CR = OKIDATA_COMMANDS.get("Carriage Return", b"\r")
+        self._CMD_LF = OKIDATA_COMMANDS.get("Line Feed", b"\n")
+        # The Left Margin count and the fallback (Margin Escape off) HT run,
+        # rebuilt only when the spinbox changes instead of on every Return.
+        self._update_margin()
+        self.left_margin_count.trace_add("write", self._update_margin)
+        # The text of the line being typed, kept up to date from handle_key so
+        # the per-keystroke paths don't have to fetch it from the Text widget.
+        # Anything handle_key can't follow (arrows, clicks, paste, editing
+        # mid-line) marks it stale, and it's re-read on next use.
+        self._current_line = ""
+        # The same line already UTF-8 encoded, so Line-by-Line mode can send it
+        # on Return without encoding it a second time.
+        self._current_line_bytes = bytearray()
+        self._line_stale = False
+        # Coalesces bursts of KeyRelease events into one line-length update.
+        self._ll_pending = False
+        # The line-length background last set, so it's only reconfigured when
+        # the color actually changes.
+        self._last_color = None
+        
         self.paned = tk.PanedWindow(master, orient=tk.HORIZONTAL)
         self.paned.pack(fill=tk.BOTH, expand=True)
         
@@ -148,26 +298,34 @@ class LiveKeystrokeEditor:
         self.text.config(yscrollcommand=self.scrollbar.set)
         self.text.bind("<KeyPress>", self.handle_key)
         self.text.bind("<KeyPress-Return>", self.handle_return)
-        self.text.bind("<KeyRelease>", self.update_line_length_display)
+        self.text.bind("<KeyPress-Tab>", self.handle_tab)
+        self.text.bind("<KeyPress-BackSpace>", self.handle_backspace)
+        self.text.bind("<KeyRelease>", self._schedule_line_length)
+        # Edits that don't come through handle_key invalidate the cached line.
+        for sequence in ("<ButtonRelease>", "<<Paste>>", "<<Cut>>"):
+            self.text.bind(sequence, self._mark_line_stale, add="+")
         self.paned.add(self.main_frame, stretch="always")
         
-        self.debug_frame = tk.Frame(self.paned)
-        self.debug_text = scrolledtext.ScrolledText(self.debug_frame, wrap="word", state=tk.DISABLED, width=30)
-        self.debug_text.pack(fill=tk.BOTH, expand=True)
-        self.paned.add(self.debug_frame)
+        # The debug panel is only built once something needs it -- Debug Mode
+        # being on, or an error to report.
+        self.debug_frame = None
+        self.debug_text = None
+        if self.debug_mode.get():
+            self._ensure_debug_panel()
+        self.debug_mode.trace_add("write", self._on_debug_toggle)
         
         self.control_frame = tk.Frame(master)
         self.control_frame.pack(fill=tk.X)
         
         self.ip_label = tk.Label(self.control_frame, text="Printer IP:")
         self.ip_label.grid(row=0, column=0, padx=5, pady=2, sticky="w")
-        self.ip_entry = tk.Entry(self.control_frame, width=15)
-        self.ip_entry.insert(0, DEFAULT_CONFIG["PRINTER_IP"])
+        self._ip_var = tk.StringVar(value=DEFAULT_CONFIG["PRINTER_IP"])
+        self.ip_entry = tk.Entry(self.control_frame, width=15, textvariable=self._ip_var)
         self.ip_entry.grid(row=0, column=1, padx=5, pady=2, sticky="w")
         self.port_label = tk.Label(self.control_frame, text="Port:")
         self.port_label.grid(row=0, column=2, padx=5, pady=2, sticky="w")
-        self.port_entry = tk.Entry(self.control_frame, width=5)
-        self.port_entry.insert(0, str(DEFAULT_CONFIG["PRINTER_PORT"]))
+        self._port_var = tk.StringVar(value=str(DEFAULT_CONFIG["PRINTER_PORT"]))
+        self.port_entry = tk.Entry(self.control_frame, width=5, textvariable=self._port_var)
         self.port_entry.grid(row=0, column=3, padx=5, pady=2, sticky="w")
         self.debug_checkbox = tk.Checkbutton(self.control_frame, text="Debug Mode", variable=self.debug_mode)
         self.debug_checkbox.grid(row=0, column=4, padx=5, pady=2)
@@ -190,8 +348,7 @@ class LiveKeystrokeEditor:
         self.add_options_frame.grid(row=1, column=3, columnspan=2, padx=5, pady=2)
         self.unidir_checkbox = tk.Checkbutton(self.add_options_frame, text="Unidirectional Printing", variable=self.unidirectional, command=self.apply_unidirectional)
         self.unidir_checkbox.pack(side=tk.LEFT, padx=2, pady=2)
-        self.enhanced_checkbox = tk.Checkbutton(self.add_options_frame, text="Enhanced Printing", variable=tk.BooleanVar(value=False), command=self.toggle_enhanced)
-        self.enhanced_checkbox.config(variable=self.enhanced_state)
+        self.enhanced_checkbox = tk.Checkbutton(self.add_options_frame, text="Enhanced Printing", variable=self.enhanced_state, command=self.toggle_enhanced)
         self.enhanced_checkbox.pack(side=tk.LEFT, padx=2, pady=2)
         
         self.dheight_checkbox = tk.Checkbutton(self.control_frame, text="Double Height", variable=self.double_height, command=self.apply_double_height)
@@ -199,69 +356,39 @@ class LiveKeystrokeEditor:
         self.proportional_checkbox = tk.Checkbutton(self.control_frame, text="Proportional", variable=self.proportional, command=self.apply_proportional)
         self.proportional_checkbox.grid(row=2, column=1, padx=5, pady=2)
         
-        self.cpi_frame = tk.LabelFrame(self.control_frame, text="CPI")
-        self.cpi_frame.grid(row=3, column=2, columnspan=2, padx=5, pady=2, sticky="w")
-        self.cpi_rb1 = tk.Radiobutton(self.cpi_frame, text="10 cpi", variable=self.cpi_var, value="10 cpi", command=self.apply_cpi)
-        self.cpi_rb1.pack(side=tk.LEFT, padx=2, pady=2)
-        self.cpi_rb2 = tk.Radiobutton(self.cpi_frame, text="12 cpi", variable=self.cpi_var, value="12 cpi", command=self.apply_cpi)
-        self.cpi_rb2.pack(side=tk.LEFT, padx=2, pady=2)
-        self.cpi_rb3 = tk.Radiobutton(self.cpi_frame, text="15 cpi", variable=self.cpi_var, value="15 cpi", command=self.apply_cpi)
-        self.cpi_rb3.pack(side=tk.LEFT, padx=2, pady=2)
-        self.cpi_rb4 = tk.Radiobutton(self.cpi_frame, text="17.1 cpi", variable=self.cpi_var, value="17.1 cpi", command=self.apply_cpi)
-        self.cpi_rb4.pack(side=tk.LEFT, padx=2, pady=2)
-        self.cpi_rb5 = tk.Radiobutton(self.cpi_frame, text="20 cpi", variable=self.cpi_var, value="20 cpi", command=self.apply_cpi)
-        self.cpi_rb5.pack(side=tk.LEFT, padx=2, pady=2)
+        # (frame attribute prefix, title, variable, [(text, value), ...], command, grid position)
+        radio_groups = [
+            ("cpi", "CPI", self.cpi_var,
+             [("10 cpi", "10 cpi"), ("12 cpi", "12 cpi"), ("15 cpi", "15 cpi"), ("17.1 cpi", "17.1 cpi"), ("20 cpi", "20 cpi")],
+             self.apply_cpi, dict(row=3, column=2, columnspan=2)),
+            ("zero", "Zero", self.zero_mode,
+             [("Slashed Zero", "Slashed Zero"), ("Unslashed Zero", "Unslashed Zero")],
+             self.apply_zero, dict(row=3, column=4)),
+            ("font", "Character Sets", self.font_var,
+             [("Block Graphic", "Block Graphic Set"), ("Publisher", "Publisher Set"),
+              ("Line Graphics", "Line Graphics Set"), ("Standard", "Standard Character Set")],
+             self.apply_font, dict(row=3, column=0, columnspan=2)),
+            ("spacing", "Spacing", self.spacing_var,
+             [("1/6", "1/6"), ("1/8", "1/8"), ("n/144", "n/144")],
+             self.apply_spacing, dict(row=4, column=0, columnspan=2)),
+            ("quality", "Print Quality", self.quality_var,
+             [("HSD/SSD", "HSD/SSD"), ("NLQ Courier", "NLQ Courier"), ("NLQ Gothic", "NLQ Gothic"), ("Utility", "Utility")],
+             self.apply_quality, dict(row=4, column=2, columnspan=2)),
+            ("speed", "Speed", self.speed_var,
+             [("Full", "Full"), ("Half", "Half")],
+             self.apply_speed, dict(row=5, column=0, columnspan=2)),
+        ]
+        for name, title, var, options, command, grid in radio_groups:
+            frame = tk.LabelFrame(self.control_frame, text=title)
+            frame.grid(padx=5, pady=2, sticky="w", **grid)
+            for text, value in options:
+                tk.Radiobutton(frame, text=text, variable=var, value=value, command=command).pack(side=tk.LEFT, padx=2, pady=2)
+            setattr(self, f"{name}_frame", frame)
         self.double_wide_checkbox = tk.Checkbutton(self.cpi_frame, text="Double Wide", variable=self.double_wide, command=self.toggle_double_wide)
         self.double_wide_checkbox.pack(side=tk.LEFT, padx=10, pady=2)
-        
-        self.zero_frame = tk.LabelFrame(self.control_frame, text="Zero")
-        self.zero_frame.grid(row=3, column=4, padx=5, pady=2, sticky="w")
-        self.zero_mode = tk.StringVar(value="Slashed Zero")
-        self.zero_rb1 = tk.Radiobutton(self.zero_frame, text="Slashed Zero", variable=self.zero_mode, value="Slashed Zero", command=self.apply_zero)
-        self.zero_rb1.pack(side=tk.LEFT, padx=2, pady=2)
-        self.zero_rb2 = tk.Radiobutton(self.zero_frame, text="Unslashed Zero", variable=self.zero_mode, value="Unslashed Zero", command=self.apply_zero)
-        self.zero_rb2.pack(side=tk.LEFT, padx=2, pady=2)
-        
-        self.font_frame = tk.LabelFrame(self.control_frame, text="Character Sets")
-        self.font_frame.grid(row=3, column=0, columnspan=2, padx=5, pady=2, sticky="w")
-        self.font_rb1 = tk.Radiobutton(self.font_frame, text="Block Graphic", variable=self.font_var, value="Block Graphic Set", command=self.apply_font)
-        self.font_rb1.pack(side=tk.LEFT, padx=2, pady=2)
-        self.font_rb2 = tk.Radiobutton(self.font_frame, text="Publisher", variable=self.font_var, value="Publisher Set", command=self.apply_font)
-        self.font_rb2.pack(side=tk.LEFT, padx=2, pady=2)
-        self.font_rb3 = tk.Radiobutton(self.font_frame, text="Line Graphics", variable=self.font_var, value="Line Graphics Set", command=self.apply_font)
-        self.font_rb3.pack(side=tk.LEFT, padx=2, pady=2)
-        self.font_rb4 = tk.Radiobutton(self.font_frame, text="Standard", variable=self.font_var, value="Standard Character Set", command=self.apply_font)
-        self.font_rb4.pack(side=tk.LEFT, padx=2, pady=2)
-        
-        self.spacing_frame = tk.LabelFrame(self.control_frame, text="Spacing")
-        self.spacing_frame.grid(row=4, column=0, columnspan=2, padx=5, pady=2, sticky="w")
-        self.spacing_rb1 = tk.Radiobutton(self.spacing_frame, text="1/6", variable=self.spacing_var, value="1/6", command=self.apply_spacing)
-        self.spacing_rb1.pack(side=tk.LEFT, padx=2, pady=2)
-        self.spacing_rb2 = tk.Radiobutton(self.spacing_frame, text="1/8", variable=self.spacing_var, value="1/8", command=self.apply_spacing)
-        self.spacing_rb2.pack(side=tk.LEFT, padx=2, pady=2)
-        self.spacing_rb3 = tk.Radiobutton(self.spacing_frame, text="n/144", variable=self.spacing_var, value="n/144", command=self.apply_spacing)
-        self.spacing_rb3.pack(side=tk.LEFT, padx=2, pady=2)
         self.spacing_n_entry = tk.Entry(self.spacing_frame, width=4, textvariable=self.spacing_n)
         self.spacing_n_entry.pack(side=tk.LEFT, padx=2, pady=2)
         
-        self.quality_frame = tk.LabelFrame(self.control_frame, text="Print Quality")
-        self.quality_frame.grid(row=4, column=2, columnspan=2, padx=5, pady=2, sticky="w")
-        self.quality_rb1 = tk.Radiobutton(self.quality_frame, text="HSD/SSD", variable=self.quality_var, value="HSD/SSD", command=self.apply_quality)
-        self.quality_rb1.pack(side=tk.LEFT, padx=2, pady=2)
-        self.quality_rb2 = tk.Radiobutton(self.quality_frame, text="NLQ Courier", variable=self.quality_var, value="NLQ Courier", command=self.apply_quality)
-        self.quality_rb2.pack(side=tk.LEFT, padx=2, pady=2)
-        self.quality_rb3 = tk.Radiobutton(self.quality_frame, text="NLQ Gothic", variable=self.quality_var, value="NLQ Gothic", command=self.apply_quality)
-        self.quality_rb3.pack(side=tk.LEFT, padx=2, pady=2)
-        self.quality_rb4 = tk.Radiobutton(self.quality_frame, text="Utility", variable=self.quality_var, value="Utility", command=self.apply_quality)
-        self.quality_rb4.pack(side=tk.LEFT, padx=2, pady=2)
-        
-        self.speed_frame = tk.LabelFrame(self.control_frame, text="Speed")
-        self.speed_frame.grid(row=5, column=0, columnspan=2, padx=5, pady=2, sticky="w")
-        self.speed_rb1 = tk.Radiobutton(self.speed_frame, text="Full", variable=self.speed_var, value="Full", command=self.apply_speed)
-        self.speed_rb1.pack(side=tk.LEFT, padx=2, pady=2)
-        self.speed_rb2 = tk.Radiobutton(self.speed_frame, text="Half", variable=self.speed_var, value="Half", command=self.apply_speed)
-        self.speed_rb2.pack(side=tk.LEFT, padx=2, pady=2)
-        
         self.skip_frame = tk.LabelFrame(self.control_frame, text="Skip Over Perforation")
         self.skip_frame.grid(row=5, column=2, padx=5, pady=2, sticky="w")
         self.skip_spinbox = tk.Spinbox(self.skip_frame, from_=0, to=9, width=3, textvariable=self.skip_perforation, command=self.apply_skip_over_perforation)
@@ -271,6 +398,9 @@ class LiveKeystrokeEditor:
         self.margin_frame.grid(row=5, column=3, padx=5, pady=2, sticky="w")
         self.margin_spinbox = tk.Spinbox(self.margin_frame, from_=0, to=20, width=3, textvariable=self.left_margin_count)
         self.margin_spinbox.pack(side=tk.LEFT, padx=2, pady=2)
+        self.margin_escape_checkbox = tk.Checkbutton(self.margin_frame, text="Margin Escape", variable=self.margin_escape, command=self.toggle_margin_escape)
+        self.margin_escape_checkbox.pack(side=tk.LEFT, padx=2, pady=2)
+        self.left_margin_count.trace_add("write", lambda *args: self.apply_left_margin())
         
         self.right_margin_label = tk.Label(self.control_frame, text="Right Margin (in):")
         self.right_margin_label.grid(row=6, column=3, padx=5, pady=2, sticky="w")
@@ -305,12 +435,270 @@ class LiveKeystrokeEditor:
         self.restore_btn = tk.Button(self.control_frame, text="Send Defaults", command=self.send_all_defaults)
         self.restore_btn.grid(row=8, column=2, padx=5, pady=2, sticky="w")
         
-        self.master.after(500, self.send_all_defaults)
+        # (ip, port) parsed once per edit of the IP/port fields rather than
+        # on every send. While the port is invalid, sends are dropped and the
+        # field is highlighted -- no per-keystroke error dialog.
+        self._port = DEFAULT_CONFIG["PRINTER_PORT"]
+        self._port_ok = True
+        self._port_entry_bg = self.port_entry.cget("bg")
+        self._validate_port()
+        self._ip_var.trace_add("write", self._update_addr)
+        self._port_var.trace_add("write", self._validate_port)
+        
+        self.printer_sock = None
+        self._sock_addr = None
+        # Outbound coalescing buffer: commands queued within a few ms of each
+        # other go out in one sendall (see _enqueue/_flush_tx).
+        self._tx_buf = bytearray()
+        self._tx_log = []
+        self._flush_pending = None
+        # Debug lines are buffered and written to the panel at most every
+        # 100 ms, instead of a full insert/see round per command.
+        self._dbg_buf = []
+        self._dbg_timer = None
+        # The socket is owned by the I/O thread; the Tk thread only ever
+        # hands it (bytes, tag, addr) tuples, so a slow or unreachable
+        # printer can't freeze the GUI.
+        self._tx_q = queue.SimpleQueue()
+        self._closing = False
+        self._io_thread = threading.Thread(target=self._io_loop, daemon=True)
+        self._io_thread.start()
+        self.master.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # control name -> (variable, value->command map, debug tag). A tuple
+        # map (Skip Over Perforation) is indexed by the variable's value.
+        self._controls = {
+            "font": (self.font_var, FONT_MAP, "[Character Set]"),
+            "cpi": (self.cpi_var, CPI_MAP, "[CPI]"),
+            "spacing": (self.spacing_var, SPACING_MAP, "[Spacing]"),
+            "quality": (self.quality_var, QUALITY_MAP, "[Quality]"),
+            "speed": (self.speed_var, SPEED_MAP, "[Speed]"),
+            "double_height": (self.double_height, DOUBLE_HEIGHT_MAP, "[Double Height]"),
+            "proportional": (self.proportional, PROPORTIONAL_MAP, "[Proportional]"),
+            "skip": (self.skip_perforation, SKIP_TABLE, "[Skip Over Perforation]"),
+        }
+        
+        # Sends are queued to the I/O thread, so the startup defaults can go
+        # out as soon as the window is idle rather than after a fixed delay.
+        self.master.after_idle(self.send_all_defaults)
+    
+    def _mirror(self, var, attr):
+        def update(*args):
+            try:
+                setattr(self, attr, var.get())
+            except tk.TclError:
+                pass  # Mid-edit (e.g. an emptied spinbox) -- keep the last good value.
+        update()
+        var.trace_add("write", update)
+    
+    def _margin_count(self):
+        # A typed-in value can go past the spinbox's range; clamp it to what
+        # LEFT_MARGIN_TABLE covers so the escape, the HT run and the
+        # line-length math all use the same margin.
+        return min(max(self.left_margin_count.get(), 0), len(LEFT_MARGIN_TABLE) - 1)
+    
+    def _update_margin(self, *args):
+        try:
+            self._margin_int = self._margin_count()
+        except tk.TclError:
+            return  # Mid-edit -- keep the last good values.
+        self._margin_tabs = self._CMD_TAB * self._margin_int
+    
+    def _update_numeric_cpi(self, *args):
+        try:
+            self._numeric_cpi = float(self.cpi_var.get().split()[0])
+        except (ValueError, IndexError):
+            self._numeric_cpi = 10.0
+        # Guaranteed positive, so the line-length math never divides by zero.
+        if not self._numeric_cpi > 0:
+            self._numeric_cpi = 10.0
+        if self.double_wide.get():
+            self._effective_cpi = self._numeric_cpi / 2.0
+        else:
+            self._effective_cpi = self._numeric_cpi
+        # Reciprocals, so the per-keystroke line-length update only multiplies.
+        self._inv_cpi = 1.0 / self._numeric_cpi
+        self._inv_effective_cpi = 1.0 / self._effective_cpi
+    
+    def _update_right_margin(self, *args):
+        try:
+            self._right_margin_cached = float(self.right_margin_var.get())
+        except (tk.TclError, ValueError):
+            self._right_margin_cached = 7.5
+    
+    def on_close(self):
+        # Let the I/O thread drain what's queued (the last keystrokes, a final
+        # Return) before the window and then the interpreter go away.
+        self._flush_tx()
+        self._closing = True
+        self._tx_q.put(None)
+        self._io_thread.join(timeout=5)
+        self.master.destroy()
+    
+    def _io_loop(self):
+        stop = False
+        while not stop:
+            # Take everything that's queued, not just one flush: batches that
+            # piled up while the previous send was in flight (e.g. during a
+            # reconnect) go out together in one sendall per address.
+            batch = [self._tx_q.get()]
+            while True:
+                try:
+                    batch.append(self._tx_q.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                stop = True
+                batch = batch[:batch.index(None)]
+            for addr, group in itertools.groupby(batch, key=lambda item: item[2]):
+                group = list(group)
+                tag = group[0][1]
+                # A lone batch is sent as-is; only a backlog is joined.
+                data = group[0][0] if len(group) == 1 else b"".join(item[0] for item in group)
+                try:
+                    self._send_bytes(addr, data)
+                except Exception as e:
+                    self._close_sock()
+                    if self._closing:
+                        continue  # No window left to report to.
+                    try:
+                        self.master.after(0, self._log_error, tag, e)
+                    except (RuntimeError, tk.TclError):
+                        pass  # The window closed mid-send.
+        self._close_sock()
+    
+    def _log_error(self, tag, e):
+        self._dbg_log(f"{tag} Error: {e}\n")
+    
+    def _dbg_log(self, line):
+        self._dbg_buf.append(line)
+        if self._dbg_timer is None:
+            self._dbg_timer = self.master.after(100, self._dbg_flush)
+    
+    def _ensure_debug_panel(self):
+        if self.debug_text is not None:
+            return
+        self.debug_frame = tk.Frame(self.paned)
+        self.debug_text = scrolledtext.ScrolledText(self.debug_frame, wrap="word", state=tk.DISABLED, width=30)
+        self.debug_text.pack(fill=tk.BOTH, expand=True)
+        self.paned.add(self.debug_frame)
+    
+    def _on_debug_toggle(self, *args):
+        if self.debug_mode.get():
+            self._ensure_debug_panel()
+    
+    def _dbg_flush(self):
+        self._dbg_timer = None
+        if not self._dbg_buf:
+            return
+        self._ensure_debug_panel()
+        text, self._dbg_buf = "".join(self._dbg_buf), []
+        self.debug_text.config(state=tk.NORMAL)
+        self.debug_text.insert(tk.END, text)
+        line_count = int(self.debug_text.index("end-1c").split(".")[0])
+        if line_count > DEBUG_MAX_LINES:
+            self.debug_text.delete("1.0", f"{line_count - DEBUG_MAX_LINES + 1}.0")
+        self.debug_text.config(state=tk.DISABLED)
+        self.debug_text.see(tk.END)
+    
+    def _update_addr(self, *args):
+        self._addr = (self._ip_var.get(), self._port)
+    
+    def _validate_port(self, *args):
+        try:
+            port = int(self._port_var.get())
+        except ValueError:
+            port = 0
+        port_ok = 0 < port < 65536
+        if port_ok:
+            self._port = port
+            self._update_addr()
+        if port_ok != self._port_ok:
+            self._port_ok = port_ok
+            self.port_entry.config(bg=self._port_entry_bg if port_ok else "pink")
+            if not port_ok:
+                self._dbg_log("[Port] Invalid port number -- commands are not sent until it is fixed.\n")
+    
+    def _get_sock(self, addr):
+        # One long-lived connection is reused for every command instead of a
+        # fresh connect per keystroke; reconnect if the IP/port was edited.
+        if self.printer_sock is not None and (self._sock_addr != addr or self._peer_closed(self.printer_sock)):
+            self._close_sock()
+        if self.printer_sock is None:
+            self.printer_sock = self._open(addr)
+            self._sock_addr = addr
+        return self.printer_sock
+    
+    def _peer_closed(self, s):
+        # A printer that closed the idle connection leaves it readable at EOF.
+        # Check before writing: the first sendall to such a socket "succeeds"
+        # and its bytes are lost; only the write after it raises.
+        try:
+            readable, _, _ = select.select([s], [], [], 0)
+            return bool(readable) and s.recv(1, socket.MSG_PEEK) == b""
+        except OSError:
+            return True
+    
+    def _open(self, addr):
+        s = socket.create_connection(addr, timeout=5)
+        # Keystrokes are 1-3 byte writes: disable Nagle so each goes out
+        # immediately instead of waiting on the printer's delayed ACK, and
+        # enable keepalive so a printer that vanished while idle is noticed.
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        return s
+    
+    def _close_sock(self):
+        if self.printer_sock is None:
+            return
+        try:
+            self.printer_sock.close()
+        except OSError:
+            pass
+        self.printer_sock = None
+        self._sock_addr = None
+    
+    def _send_bytes(self, addr, command_bytes):
+        try:
+            self._get_sock(addr).sendall(memoryview(command_bytes))
+        except (BrokenPipeError, ConnectionResetError):
+            # The printer dropped the idle connection -- reconnect once and resend.
+            self._close_sock()
+            self._get_sock(addr).sendall(memoryview(command_bytes))
+    
+    def _enqueue(self, command_bytes, tag):
+        self._tx_buf.extend(command_bytes)
+        # The debug line is formatted here, once, and carried with the batch
+        # so the flush doesn't have to reformat it.
+        self._tx_log.append((tag, _fmt_log(tag, bytes(command_bytes)) if self._debug else None))
+        if self._flush_pending is None:
+            self._flush_pending = self.master.after(5, self._flush_tx)
+    
+    def _flush_tx(self):
+        if self._flush_pending is not None:
+            self.master.after_cancel(self._flush_pending)
+            self._flush_pending = None
+        if not self._tx_buf:
+            return
+        buf, self._tx_buf = self._tx_buf, bytearray()
+        log, self._tx_log = self._tx_log, []
+        if not self._port_ok:
+            # Dropped, and already reported once by _validate_port -- keep the
+            # panel to what actually went to the printer.
+            return
+        lines = "".join(line for _, line in log if line is not None)
+        if lines:
+            self._dbg_log(lines)
+        # buf was swapped out above, so the I/O thread can own it outright --
+        # no copy to bytes needed (it's only joined when several batches have
+        # backed up behind a slow send).
+        self._tx_q.put((buf, log[0][0], self._addr))
     
     def send_manual_command(self, cmd_name):
         command = OKIDATA_COMMANDS.get(cmd_name, b"")
         if command:
             self.send_live_command(command)
+            self._flush_tx()
     
     def send_shift(self):
         if self.shift_state.get():
@@ -323,144 +711,82 @@ class LiveKeystrokeEditor:
             self.send_live_command(command)
     
     def send_command_immediately(self, command_bytes, tag=""):
-        dec_str = " ".join(str(b) for b in command_bytes)
-        if self.debug_mode.get():
-            self.debug_text.config(state=tk.NORMAL)
-            self.debug_text.insert(tk.END, f"{tag} {dec_str}\n")
-            self.debug_text.config(state=tk.DISABLED)
-            self.debug_text.see(tk.END)
-        printer_ip = self.ip_entry.get()
-        try:
-            printer_port = int(self.port_entry.get())
-        except ValueError:
-            messagebox.showerror("Error", "Invalid port number.")
-            return
-        try:
-            with socket.create_connection((printer_ip, printer_port), timeout=5) as s:
-                s.sendall(command_bytes)
-        except Exception as e:
-            self.debug_text.config(state=tk.NORMAL)
-            self.debug_text.insert(tk.END, f"{tag} Error: {e}\n")
-            self.debug_text.config(state=tk.DISABLED)
-            self.debug_text.see(tk.END)
+        self._enqueue(command_bytes, tag)
     
     def send_all_defaults(self):
-        self.restore_defaults()
-        self.apply_font()
-        self.apply_cpi()
-        self.apply_spacing()
-        self.apply_quality()
-        self.apply_speed()
-        self.apply_double_height()
-        self.apply_proportional()
-        self.apply_skip_over_perforation()
-    
-    def restore_defaults(self):
-        commands = OKIDATA_COMMANDS
-        printer_ip = self.ip_entry.get()
-        try:
-            printer_port = int(self.port_entry.get())
-        except ValueError:
-            messagebox.showerror("Error", "Invalid port number.")
-            return
-        reset_cmd = commands.get("Reset (Clear Print Buffer)", b"")
-        cpi_cmd = commands.get(f"Select {self.cpi_var.get()}", b"")
-        skip_val = self.skip_perforation.get()
-        skip_cmd = commands.get("Skip Over Perforation", lambda n: b"")(skip_val)
-        full_cmd = reset_cmd + cpi_cmd + skip_cmd
-        if self.debug_mode.get():
-            dec_str = " ".join(str(b) for b in full_cmd)
-            self.debug_text.config(state=tk.NORMAL)
-            self.debug_text.insert(tk.END, f"[Restore Defaults] {dec_str}\n")
-            self.debug_text.config(state=tk.DISABLED)
-            self.debug_text.see(tk.END)
-        try:
-            with socket.create_connection((printer_ip, printer_port), timeout=5) as s:
-                s.sendall(full_cmd)
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to send default commands: {e}")
+        self.send_command_immediately(self._build_defaults(), "[Defaults]")
     
-    def apply_font(self):
-        font = self.font_var.get()
-        command = b""
-        if font == "Block Graphic Set":
-            command = OKIDATA_COMMANDS.get("Block Graphic Set", b"")
-        elif font == "Publisher Set":
-            command = OKIDATA_COMMANDS.get("Publisher Set", b"")
-        elif font == "Line Graphics Set":
-            command = OKIDATA_COMMANDS.get("Line Graphics Set", b"")
-        elif font == "Standard Character Set":
-            command = OKIDATA_COMMANDS.get("Standard Character Set", b"")
+    def _build_defaults(self):
+        # Reset, then every integrated control's current setting, as one
+        # command string so startup costs a single send.
+        full_cmd = bytearray(OKIDATA_COMMANDS["Reset (Clear Print Buffer)"])
+        for control in ("cpi", "skip", "font", "spacing", "quality", "speed", "double_height", "proportional"):
+            full_cmd += self._cmd_for(control)
+        if self.margin_escape.get():
+            full_cmd += self._left_margin_cmd()
+        return full_cmd
+    
+    def _cmd_for(self, control):
+        var, table, _ = self._controls[control]
+        if isinstance(table, tuple):
+            return _table_cmd(table, var.get())
+        command = table.get(var.get(), b"")
+        if isinstance(command, tuple):
+            # n/144 spacing takes its n from the entry next to the radio button.
+            command = _table_cmd(command, self.spacing_n.get())
+        return command
+    
+    def _apply(self, control):
+        command = self._cmd_for(control)
         if command:
-            self.send_command_immediately(command, "[Character Set]")
+            self.send_command_immediately(command, self._controls[control][2])
+    
+    def apply_font(self):
+        self._apply("font")
     
     def apply_cpi(self):
-        if self.cpi_var.get() != "Double Wide":
-            key = f"Select {self.cpi_var.get()}"
-            command = OKIDATA_COMMANDS.get(key, b"")
-            if command:
-                self.send_command_immediately(command, "[CPI]")
-        # Double wide is controlled by the checkbox.
+        # Double wide is controlled by the checkbox, not by cpi_var.
+        self._apply("cpi")
     
     def apply_spacing(self):
-        spacing = self.spacing_var.get()
-        command = b""
-        if spacing == "1/6":
-            command = OKIDATA_COMMANDS.get("Set Spacing to 1/6\"", b"")
-        elif spacing == "1/8":
-            command = OKIDATA_COMMANDS.get("Set Spacing to 1/8\"", b"")
-        elif spacing == "n/144":
-            n_val = self.spacing_n.get()
-            command = OKIDATA_COMMANDS.get("Set Spacing to n/144", lambda n: b"")(n_val)
-        if command:
-            self.send_command_immediately(command, "[Spacing]")
+        self._apply("spacing")
     
     def apply_quality(self):
-        quality = self.quality_var.get()
-        command = b""
-        if quality == "HSD/SSD":
-            command = OKIDATA_COMMANDS.get("Print Quality Select HSD/SSD", b"")
-        elif quality == "NLQ Courier":
-            command = OKIDATA_COMMANDS.get("Select NLQ Courier", b"")
-        elif quality == "NLQ Gothic":
-            command = OKIDATA_COMMANDS.get("Select NLQ Gothic", b"")
-        elif quality == "Utility":
-            command = OKIDATA_COMMANDS.get("Select Utility", b"")
-        if command:
-            self.send_command_immediately(command, "[Quality]")
+        self._apply("quality")
     
     def apply_speed(self):
-        speed = self.speed_var.get()
-        command = b""
-        if speed == "Full":
-            command = OKIDATA_COMMANDS.get("Print Speed Set to Full", b"")
-        elif speed == "Half":
-            command = OKIDATA_COMMANDS.get("Print Speed Set to Half", b"")
-        if command:
-            self.send_command_immediately(command, "[Speed]")
+        self._apply("speed")
     
     def apply_double_height(self):
-        command = b""
-        if self.double_height.get():
-            command = OKIDATA_COMMANDS.get("Double Height On", b"")
-        else:
-            command = OKIDATA_COMMANDS.get("Double Height Off", b"")
-        if command:
-            self.send_command_immediately(command, "[Double Height]")
+        self._apply("double_height")
     
     def apply_proportional(self):
-        command = b""
-        if self.proportional.get():
-            command = OKIDATA_COMMANDS.get("Proportional Printing On", b"")
-        else:
-            command = OKIDATA_COMMANDS.get("Proportional Printing Off", b"")
-        if command:
-            self.send_command_immediately(command, "[Proportional]")
+        self._apply("proportional")
     
     def apply_skip_over_perforation(self):
-        value = self.skip_perforation.get()
-        command = OKIDATA_COMMANDS.get("Skip Over Perforation", lambda n: b"")(value)
-        self.send_command_immediately(command, "[Skip Over Perforation]")
+        self._apply("skip")
+    
+    def _left_margin_cmd(self):
+        try:
+            return LEFT_MARGIN_TABLE[self._margin_count()]
+        except tk.TclError:
+            return b""
+    
+    def apply_left_margin(self):
+        # With the escape off nothing is sent; handle_return pads each line
+        # with HTs instead.
+        if self.margin_escape.get():
+            command = self._left_margin_cmd()
+            if command:
+                self.send_command_immediately(command, "[Left Margin]")
+    
+    def toggle_margin_escape(self):
+        if self.margin_escape.get():
+            self.apply_left_margin()
+        else:
+            # Turned off after use: park the printer margin back at column 1
+            # so the HT padding lines up.
+            self.send_command_immediately(LEFT_MARGIN_TABLE[0], "[Left Margin]")
     
     def apply_underline(self):
         if self.underline_printing.get():
@@ -509,7 +835,7 @@ class LiveKeystrokeEditor:
                 self.send_command_immediately(command, "[Double Wide ON]")
         else:
             self.apply_cpi()
-        self.update_line_length_display()
+        self._schedule_line_length()
     
     def apply_zero(self):
         if self.zero_mode.get() == "Slashed Zero":
@@ -522,99 +848,122 @@ class LiveKeystrokeEditor:
             self.send_command_immediately(command, tag)
     
     def send_live_command(self, command_bytes):
-        dec_str = " ".join(str(b) for b in command_bytes)
-        if self.debug_mode.get():
-            self.debug_text.config(state=tk.NORMAL)
-            self.debug_text.insert(tk.END, f"[Live Keystroke] {dec_str}\n")
-            self.debug_text.config(state=tk.DISABLED)
-            self.debug_text.see(tk.END)
-        printer_ip = self.ip_entry.get()
-        try:
-            printer_port = int(self.port_entry.get())
-        except ValueError:
-            messagebox.showerror("Error", "Invalid port number.")
-            return
-        try:
-            with socket.create_connection((printer_ip, printer_port), timeout=5) as s:
-                s.sendall(command_bytes)
-        except Exception as e:
-            self.debug_text.config(state=tk.NORMAL)
-            self.debug_text.insert(tk.END, f"[Live Keystroke] Error: {e}\n")
-            self.debug_text.config(state=tk.DISABLED)
-            self.debug_text.see(tk.END)
+        self._enqueue(command_bytes, "[Live Keystroke]")
     
     def handle_key(self, event):
-        if event.keysym == "Return":
+        char = event.char
+        if not char:
+            # Cursor movement; bare modifier keys like Shift change nothing.
+            if event.keysym in CURSOR_KEYS:
+                self._line_stale = True
             return
-        if self.mode_var.get() == "Live":
-            command = b""
-            if event.keysym == "Tab":
-                command = OKIDATA_COMMANDS.get("Horizontal Tab", b"\t")
-            elif event.keysym == "BackSpace":
-                command = OKIDATA_COMMANDS.get("Backspace", b"\x08")
+        if event.state & self._command_mods:
+            # Shortcuts insert nothing, so send nothing and have the line
+            # re-read rather than caching a character that isn't on screen.
+            self._line_stale = True
+            return
+        # One ord() and at most one encode, shared by the line cache and the send.
+        code = ord(char)
+        data = ASCII_BYTES[code] if code < 128 else char.encode('utf-8')
+        if not self._line_stale:
+            if code == 9 or (code >= 32 and code != 127):
+                self._current_line += char
+                self._current_line_bytes += data
             else:
-                if event.char and ord(event.char) >= 32:
-                    command = event.char.encode('utf-8')
-            if command:
-                self.send_live_command(command)
-        else:
+                # Control characters (paste, undo, Delete, ...).
+                self._line_stale = True
+        if (code >= 128 or PRINTABLE[code]) and self._mode == "Live":
+            # Printable keys ride the coalescing buffer: one write per burst
+            # of typing.
+            self.send_live_command(data)
+    
+    def handle_tab(self, event):
+        if event.state & TAB_MODIFIERS:
+            # Shift-/Ctrl-Tab move focus rather than inserting a tab: send
+            # nothing, and have the line re-read instead of guessing.
+            self._line_stale = True
             return
+        if not self._line_stale:
+            self._current_line += "\t"
+            self._current_line_bytes += self._CMD_TAB
+        if self._mode == "Live":
+            # Tab moves the head, so it flushes what's queued along with itself.
+            self.send_live_command(self._CMD_TAB)
+            self._flush_tx()
+    
+    def handle_backspace(self, event):
+        if not self._line_stale:
+            last = self._current_line[-1:]
+            if last:
+                self._current_line = self._current_line[:-1]
+                del self._current_line_bytes[-len(last.encode('utf-8')):]
+            else:
+                # At the start of the line Backspace joins it onto the previous
+                # one, so the cache no longer matches the widget.
+                self._line_stale = True
+        if self._mode == "Live":
+            # Backspace moves the head, so it flushes what's queued along with itself.
+            self.send_live_command(self._CMD_BS)
+            self._flush_tx()
     
     def handle_return(self, event):
-        commands = OKIDATA_COMMANDS
-        if self.mode_var.get() == "Line-by-Line":
-            line_text = self.text.get("insert linestart", "insert lineend")
-            cr = commands.get("Carriage Return", b"\r")
-            lf = commands.get("Line Feed", b"\n")
-            self.send_live_command(cr)
-            self.master.after(10, lambda: self.send_live_command(lf))
-            self.master.after(20, self.send_left_margin)
-            self.master.after(30, lambda: self.send_live_command(line_text.encode('utf-8')))
+        line = b""
+        if self._mode == "Line-by-Line":
+            self._current_line_text()  # Re-sync both caches if stale.
+            line = self._current_line_bytes
             self.text.insert("insert", "\n")
-            self.update_line_length_display()
-            return None
-        else:
-            cr = commands.get("Carriage Return", b"\r")
-            lf = commands.get("Line Feed", b"\n")
-            self.send_live_command(cr)
-            self.master.after(10, lambda: self.send_live_command(lf))
-            self.master.after(20, self.send_left_margin)
-            self.update_line_length_display()
-            return None
-    
-    def send_left_margin(self):
-        count = self.left_margin_count.get()
-        for _ in range(count):
-            self.send_live_command(OKIDATA_COMMANDS.get("Horizontal Tab", b"\t"))
+        # Sent right away rather than from after_idle: keys already waiting in
+        # the event queue would otherwise reach the printer ahead of the CR/LF.
+        self._emit_return_sequence(line)
+        self._current_line = ""
+        self._current_line_bytes.clear()
+        self._schedule_line_length()
+        return None
+    
+    def _emit_return_sequence(self, line):
+        # CR, LF, the left-margin tabs and (in Line-by-Line mode) the line
+        # itself go out as one payload in one write, in that order.
+        payload = bytearray(self._CMD_CR)
+        payload += self._CMD_LF
+        if not self._margin_escape:
+            payload += self._margin_tabs
+        payload += line
+        self.send_live_command(payload)
+        self._flush_tx()
+    
+    def _mark_line_stale(self, event=None):
+        self._line_stale = True
+    
+    def _current_line_text(self):
+        if self._line_stale:
+            self._current_line = self.text.get("insert linestart", "insert lineend")
+            self._current_line_bytes = bytearray(self._current_line.encode('utf-8'))
+            # Only trust incremental updates again once the cursor is back at
+            # the end of the line, where handle_key's appends land.
+            self._line_stale = self.text.compare("insert", "!=", "insert lineend")
+        return self._current_line
+    
+    def _schedule_line_length(self, event=None):
+        if not self._ll_pending:
+            self._ll_pending = True
+            self.master.after(50, self._do_line_length_update)
+    
+    def _do_line_length_update(self):
+        self._ll_pending = False
+        self.update_line_length_display()
     
     def update_line_length_display(self, event=None):
-        line_text = self.text.get("insert linestart", "insert lineend")
-        char_count = len(line_text)
-        try:
-            numeric_cpi = float(self.cpi_var.get().split()[0])
-        except:
-            numeric_cpi = 10.0
-        if self.double_wide.get():
-            effective_cpi = numeric_cpi / 2.0
-        else:
-            effective_cpi = numeric_cpi
-        try:
-            line_length = ((8.0 * self.left_margin_count.get()) / numeric_cpi) + (char_count / effective_cpi)
-        except ZeroDivisionError:
-            line_length = 0.0
-        self.line_length_display.config(text=f"Line Length: {line_length:.2f} in")
-        try:
-            right_margin = float(self.right_margin_var.get())
-        except:
-            right_margin = 7.5
-        gap = right_margin - line_length
-        if gap >= 0.5:
-            color = "green"
-        elif 0 <= gap < 0.5:
-            color = "yellow"
+        char_count = len(self._current_line_text())
+        line_length = 8.0 * self._margin_int * self._inv_cpi + char_count * self._inv_effective_cpi
+        gap = self._right_margin_cached - line_length
+        color = LINE_LENGTH_COLORS[(gap >= 0) + (gap >= 0.5)]
+        config = self.line_length_display.config
+        text = f"Line Length: {line_length:.2f} in"
+        if color != self._last_color:
+            self._last_color = color
+            config(text=text, bg=color)
         else:
-            color = "red"
-        self.line_length_display.config(bg=color)
+            config(text=text)
 
 def main():
     root = tk.Tk()